@@ -1,29 +1,63 @@
 #!/usr/bin/env python3
+import argparse
+import gzip
 import json
 import re
 import sys
-from collections import defaultdict
 
 # Regex to match export lines like:
 # export NORTHCENTRALUS_AZURE_TENANT_ID="secret"
-LINE_RE = re.compile(r'^\s*export\s+([A-Z0-9_]+)\s*=\s*(.*)\s*$')
+# Wrapping quotes are stripped by the regex itself: group 2 is a double-quoted
+# value, group 3 a single-quoted one and group 4 an unquoted one.
+# A lone quote (export A=") is an empty value, as with the old strip-the-quotes parsing.
+# MULTILINE lets group_by_region scan a block of lines in one finditer pass;
+# [^\S\n] (whitespace other than newline) is used around tokens so a match
+# never spans more than one line.
+LINE_RE = re.compile(r'^[^\S\n]*export[^\S\n]+([A-Z0-9_]+)[^\S\n]*=[^\S\n]*(?:"(.*)"|\'(.*)\'|["\']|(.*?))[^\S\n]*$',
+                     re.MULTILINE)
+# Single-line form of the same grammar for parse_export_line; fullmatch with plain \s
+# keeps its one-line contract (no MULTILINE match on the first of several lines).
+_fullmatch = re.compile(r'\s*export\s+([A-Z0-9_]+)\s*=\s*(?:"(.*)"|\'(.*)\'|["\']|(.*?))\s*').fullmatch
+
+# Input is read in blocks of this many characters so large files are never held in memory whole
+READ_CHUNK = 1 << 20
 
 def parse_export_line(line):
     """Parse an export line into (name, value). Strip quotes if present."""
-    m = LINE_RE.match(line)
+    m = _fullmatch(line)
     if not m:
         return None, None
-    name, value = m.group(1), m.group(2).strip()
-    if not value or value in ('""', "''"):
-        return name, ""
-    # Strip wrapping quotes
-    if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
-        value = value[1:-1]
-    return name, value
+    return m.group(1), m.group(2) or m.group(3) or m.group(4) or ""
+
+def iter_export_matches(fp):
+    """
+    Yield matches for the export lines in fp, a text file or any iterable of lines.
+    A file is read in READ_CHUNK blocks; a trailing partial line is carried
+    over to the next block so every match covers a complete line. Other
+    iterables are matched line by line with parse_export_line's pattern.
+    """
+    if not hasattr(fp, "read"):
+        for line in fp:
+            m = _fullmatch(line)
+            if m:
+                yield m
+        return
+    tail = ""
+    while True:
+        chunk = fp.read(READ_CHUNK)
+        if not chunk:
+            break
+        buf = tail + chunk
+        cut = buf.rfind("\n") + 1
+        tail = buf[cut:]
+        yield from LINE_RE.finditer(buf, 0, cut)
+    if tail:
+        yield from LINE_RE.finditer(tail)
 
-def group_by_region(env_lines):
+def group_by_region(fp):
     """
-    Turn lines like NORTHCENTRALUS_AZURE_CLIENT_ID into:
+    Turn the export lines in fp (a text file or any iterable of lines) like
+    NORTHCENTRALUS_AZURE_CLIENT_ID into:
     {
       "NORTHCENTRALUS": {
          "AZURE_CLIENT_ID": "xxxx",
@@ -32,39 +66,55 @@ def group_by_region(env_lines):
       ...
     }
     """
-    regions = defaultdict(dict)
-    for line in env_lines:
-        name, value = parse_export_line(line)
-        if not name or not value:
+    regions = {}
+    regions_get = regions.get
+    for m in iter_export_matches(fp):
+        name, value = m.group(1), m.group(2) or m.group(3) or m.group(4)
+        if not value:
             continue
         # Split the variable name into REGION and remainder
         # e.g. NORTHCENTRALUS_AZURE_CLIENT_ID → REGION=NORTHCENTRALUS, VAR=AZURE_CLIENT_ID
-        parts = name.split("_", 1)
-        if len(parts) < 2:
+        region, sep, var = name.partition("_")
+        if not sep:
             continue
-        region, var = parts
-        regions[region][var] = value
+        bucket = regions_get(region)
+        if bucket is None:
+            regions[region] = {var: value}
+        else:
+            bucket[var] = value
     return regions
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python build_azure_json.py <input_file> [output_file]")
-        sys.exit(1)
-
-    infile = sys.argv[1]
-    outfile = sys.argv[2] if len(sys.argv) > 2 else "azure_secrets.json"
+    parser = argparse.ArgumentParser(description="Group per-region export lines into a JSON document keyed by region.")
+    parser.add_argument("input", help="Path to file with 'export REGION_NAME=VALUE' lines")
+    parser.add_argument("output", nargs="?", default="azure_secrets.json",
+                        help="Output JSON path (default: azure_secrets.json)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write compact JSON (no indentation) for use as a secret value")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Gzip-compress the output (appends .gz to the output path)")
+    args = parser.parse_args()
 
-    with open(infile, encoding="utf-8") as f:
-        lines = f.readlines()
-
-    regions = group_by_region(lines)
+    with open(args.input, encoding="utf-8") as f:
+        regions = group_by_region(f)
 
     if not regions:
         print("No valid exports found in file.")
         sys.exit(1)
 
-    with open(outfile, "w", encoding="utf-8") as f:
-        json.dump(regions, f, indent=2, sort_keys=True)
+    outfile = args.output
+    if args.gzip:
+        if not outfile.endswith(".gz"):
+            outfile += ".gz"
+        out = gzip.open(outfile, "wt", encoding="utf-8")
+    else:
+        out = open(outfile, "w", encoding="utf-8")
+
+    with out as f:
+        if args.compact:
+            json.dump(regions, f, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+        else:
+            json.dump(regions, f, indent=2, sort_keys=True)
 
     print(f"✅ Wrote {len(regions)} regions to {outfile}")
 
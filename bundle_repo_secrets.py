@@ -1,37 +1,65 @@
 #!/usr/bin/env python3
 import argparse
+import base64
 import json
 import os
 import re
 import subprocess
 import sys
-from typing import Dict, Tuple, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, List
 
-EXPORT_RE = re.compile(r'^\s*export\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)\s*$')
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to the stdlib encoder
+    orjson = None
+
+try:  # optional: set shards in-process via the REST API instead of one gh call per shard
+    import requests
+    from nacl import encoding, public
+except ImportError:
+    requests = None
+
+GITHUB_API = "https://api.github.com"
+# (connect, read) seconds; requests otherwise waits forever and a stalled call hangs a pool worker
+GITHUB_API_TIMEOUT = (5, 30)
+# Above this many shards, one API session beats spawning gh (and its public-key fetch) per shard
+REST_MIN_SHARDS = 4
+
+def _dumps(obj) -> bytes:
+    """Compact UTF-8 JSON encoding of obj, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+# Groups: 1 = name, 2 = double-quoted value, 3 = single-quoted value, 4 = unquoted value.
+# A lone quote (export A=") is an empty value, as with the old strip-the-quotes parsing.
+# MULTILINE so load_exports can scan the whole input with finditer; [^\S\n] is
+# whitespace other than newline, which keeps each match on a single line, and the
+# leading anchor skips '#' comment lines.
+EXPORT_RE = re.compile(r'^[^\S\n]*export[^\S\n]+([A-Za-z_][A-Za-z0-9_]*)[^\S\n]*=[^\S\n]*(?:"(.*)"|\'(.*)\'|["\']|(.*?))[^\S\n]*$',
+                       re.MULTILINE)
+# Single-line form of the same grammar for parse_export_line; fullmatch with plain \s
+# keeps its one-line contract (no MULTILINE match on the first of several lines).
+_fullmatch = re.compile(r'\s*export\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(?:"(.*)"|\'(.*)\'|["\']|(.*?))\s*').fullmatch
+
+_PLACEHOLDERS = frozenset({"", "<secret-content>", "<REPLACE_ME>", "CHANGEME"})
 
 def parse_export_line(line: str) -> Tuple[str, str]:
-    m = EXPORT_RE.match(line)
+    m = _fullmatch(line)
     if not m:
         raise ValueError("Not an export line")
-    name, raw = m.group(1), m.group(2).strip()
-    if raw == "":
-        return name, ""
-    if (raw.startswith('"') and raw.endswith('"')) or (raw.startswith("'") and raw.endswith("'")):
-        raw = raw[1:-1]
-    return name, raw
+    return m.group(1), m.group(2) or m.group(3) or m.group(4) or ""
 
 def load_exports(fp) -> Dict[str, str]:
+    text = fp.read()
     secrets = {}
-    for i, line in enumerate(fp, start=1):
-        line = line.rstrip('\n')
-        if not line or line.lstrip().startswith('#'):
-            continue
-        try:
-            name, value = parse_export_line(line)
-        except ValueError:
-            continue
-        if value in {"", "<secret-content>", "<REPLACE_ME>", "CHANGEME"}:
-            sys.stderr.write(f"Skipping {name}: empty/placeholder on line {i}\n")
+    for m in EXPORT_RE.finditer(text):
+        name, value = m.group(1), m.group(2) or m.group(3) or m.group(4) or ""
+        if value in _PLACEHOLDERS:
+            line_no = text.count("\n", 0, m.start()) + 1
+            sys.stderr.write(f"Skipping {name}: empty/placeholder on line {line_no}\n")
             continue
         secrets[name] = value
     return secrets
@@ -46,13 +74,16 @@ def group_by_region(flat: Dict[str, str]) -> Dict[str, Dict[str, str]]:
     If a name has no underscore, it goes under region 'DEFAULT' with the full name as key.
     """
     grouped: Dict[str, Dict[str, str]] = {}
+    grouped_get = grouped.get
     for full, val in flat.items():
-        if "_" in full:
-            region, key = full.split("_", 1)
-        else:
+        region, sep, key = full.partition("_")
+        if not sep:
             region, key = "DEFAULT", full
-        bucket = grouped.setdefault(region, {})
-        bucket[key] = val
+        bucket = grouped_get(region)
+        if bucket is None:
+            grouped[region] = {key: val}
+        else:
+            bucket[key] = val
     return grouped
 
 def ensure_gh_logged_in():
@@ -62,14 +93,84 @@ def ensure_gh_logged_in():
     except (subprocess.CalledProcessError, FileNotFoundError):
         sys.exit("ERROR: GitHub CLI ('gh') not available or not logged in. Run: gh auth login")
 
-def set_secret(repo: str, name: str, value: str, dry_run: bool = False) -> bool:
+def _github_token() -> str:
+    """Return gh's stored token, so no further gh processes are needed."""
+    proc = subprocess.run(["gh", "auth", "token", "-h", "github.com"],
+                          check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return proc.stdout.strip()
+
+def _github_session(token: str) -> "requests.Session":
+    """Return a keep-alive requests.Session authenticated with token."""
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    })
+    return session
+
+class RestSecretClient:
+    """
+    Sets repository secrets through the GitHub REST API.
+    The repo public key is fetched once and reused to seal every value.
+    requests.Session isn't documented as thread-safe, so each pool thread
+    gets its own keep-alive session.
+    """
+
+    def __init__(self, repo: str):
+        self.repo = repo
+        self.token = _github_token()
+        self._local = threading.local()
+        resp = self.session.get(f"{GITHUB_API}/repos/{repo}/actions/secrets/public-key",
+                                timeout=GITHUB_API_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
+        self.key_id = data["key_id"]
+        self.box = public.SealedBox(public.PublicKey(data["key"].encode(), encoding.Base64Encoder))
+
+    @property
+    def session(self) -> "requests.Session":
+        """This thread's session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = _github_session(self.token)
+        return session
+
+    def set_secret(self, name: str, value: str):
+        sealed = base64.b64encode(self.box.encrypt(value.encode("utf-8"))).decode("ascii")
+        resp = self.session.put(f"{GITHUB_API}/repos/{self.repo}/actions/secrets/{name}",
+                                json={"encrypted_value": sealed, "key_id": self.key_id},
+                                timeout=GITHUB_API_TIMEOUT)
+        resp.raise_for_status()
+
+def make_rest_client(repo: str) -> Optional[RestSecretClient]:
+    """Return a RestSecretClient, or None to fall back to gh (deps missing or setup failed)."""
+    if requests is None:
+        return None
+    try:
+        return RestSecretClient(repo)
+    except (subprocess.CalledProcessError, requests.RequestException, KeyError, ValueError) as e:
+        sys.stderr.write(f"REST API unavailable ({e}); falling back to gh secret set\n")
+        return None
+
+def set_secret(repo: str, name: str, value: str, dry_run: bool = False,
+               client: Optional[RestSecretClient] = None) -> bool:
     if dry_run:
         print(f"[dry-run] Would set secret {name} in {repo} (size {len(value.encode('utf-8'))} bytes)")
         return True
+    if client is not None:
+        try:
+            client.set_secret(name, value)
+            return True
+        except requests.RequestException as e:
+            sys.stderr.write(f"Failed to set {name}: {e}\n")
+            return False
     try:
+        # Feed the payload on stdin: large JSON bundles can exceed argv limits and
+        # would otherwise be visible in the process list.
         proc = subprocess.run(
-            ["gh", "secret", "set", name, "-R", repo, "-b", value],
-            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            ["gh", "secret", "set", name, "-R", repo],
+            input=value, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
         )
         return proc.returncode == 0
     except subprocess.CalledProcessError as e:
@@ -77,40 +178,56 @@ def set_secret(repo: str, name: str, value: str, dry_run: bool = False) -> bool:
         sys.stderr.write(f"Failed to set {name}: {msg}\n")
         return False
 
+class _Shard:
+    """Regions packed into one secret so far, and that secret's serialized size in bytes."""
+    __slots__ = ("regions", "bytes_used")
+
+    def __init__(self, region: str, size: int):
+        self.regions: List[str] = [region]
+        self.bytes_used = 2 + size  # '{' member '}'
+
+    def add(self, region: str, size: int):
+        self.regions.append(region)
+        self.bytes_used += size + 1  # ',' member
+
 def shard_payloads(grouped: Dict[str, Dict[str, str]],
                    max_bytes: int,
-                   bundle_name: str) -> Tuple[List[Tuple[str, str]], Dict]:
+                   bundle_name: str,
+                   pack: str = "ffd") -> Tuple[List[Tuple[str, str]], Dict]:
     """
     Pack regions into as few JSON secrets as possible under max_bytes.
+    Regions are placed largest first, into the first shard with room ("ffd",
+    First-Fit-Decreasing) or the fullest shard with room ("bfd", Best-Fit-Decreasing).
     Returns: list of (secret_name, json_string), and a manifest dict.
     """
-    regions_sorted = sorted(grouped.keys())
-    shards: List[Tuple[str, str]] = []
-    current: Dict[str, Dict[str, str]] = {}
-    shard_index = 1
-
-    def bytes_len(obj) -> int:
-        return len(json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
-
-    for r in regions_sorted:
-        # try adding region r into current shard
-        tentative = dict(current)
-        tentative[r] = grouped[r]
-        if bytes_len(tentative) <= max_bytes or not current:
-            current = tentative
+    # Serialize each region once as a '"REGION":{...}' member ({r: grouped[r]} without
+    # the outer braces). A shard is then '{' + members joined by ',' + '}', so its size
+    # is 2 + sum(member sizes) + one comma between members, and emitting it is a concat.
+    frags = {r: _dumps({r: grouped[r]})[1:-1] for r in grouped}
+    region_bytes = {r: len(frag) for r, frag in frags.items()}
+    order = sorted(grouped.keys(), key=lambda r: (-region_bytes[r], r))
+
+    bins: List[_Shard] = []
+
+    for r in order:
+        size = region_bytes[r]
+        # if even a single region is too big (extremely unlikely), fail early
+        if size + 2 > max_bytes:
+            raise RuntimeError(f"Region '{r}' alone exceeds max_bytes={max_bytes}. Consider increasing --max-bytes or compressing externally.")
+        # +1 for the comma separating r from the members already in the shard
+        fits = [b for b in bins if b.bytes_used + size + 1 <= max_bytes]
+        if not fits:
+            bins.append(_Shard(r, size))
+        elif pack == "ffd":
+            fits[0].add(r, size)
         else:
-            # flush current shard
-            shards.append((f"{bundle_name}_{shard_index}", json.dumps(current, separators=(',', ':'), ensure_ascii=False)))
-            shard_index += 1
-            current = {r: grouped[r]}
-            # if even a single region is too big (extremely unlikely), fail early
-            if bytes_len(current) > max_bytes:
-                raise RuntimeError(f"Region '{r}' alone exceeds max_bytes={max_bytes}. Consider increasing --max-bytes or compressing externally.")
-
-    if current:
-        # last shard
-        name = bundle_name if shard_index == 1 else f"{bundle_name}_{shard_index}"
-        shards.append((name, json.dumps(current, separators=(',', ':'), ensure_ascii=False)))
+            max(fits, key=lambda b: b.bytes_used).add(r, size)
+
+    shards: List[Tuple[str, str]] = []
+    for shard_index, current in enumerate(bins, start=1):
+        name = bundle_name if len(bins) == 1 else f"{bundle_name}_{shard_index}"
+        payload = b"{" + b",".join(frags[r] for r in sorted(current.regions)) + b"}"
+        shards.append((name, payload.decode('utf-8')))
 
     # Build manifest if multiple shards
     manifest = {
@@ -132,7 +249,11 @@ def main():
                         help="Base name for the combined secret(s). Default: AZURE_REGION_CONFIGS")
     parser.add_argument("--max-bytes", type=int, default=60000,
                         help="Max bytes per secret payload (safety margin under GitHub ~64KB). Default: 60000")
+    parser.add_argument("--pack", choices=("ffd", "bfd"), default="ffd",
+                        help="Shard packing heuristic: first-fit or best-fit, largest region first. Default: ffd")
     parser.add_argument("--dry-run", action="store_true", help="Print actions without creating secrets")
+    parser.add_argument("--use-gh-cli", action="store_true",
+                        help="Always shell out to 'gh secret set', even if requests and PyNaCl are installed")
     args = parser.parse_args()
 
     ensure_gh_logged_in()
@@ -148,13 +269,30 @@ def main():
         sys.exit("No valid secrets found (all empty/placeholders or no export lines).")
 
     grouped = group_by_region(flat)
-    shards, manifest = shard_payloads(grouped, args.max_bytes, args.bundle_name)
+    shards, manifest = shard_payloads(grouped, args.max_bytes, args.bundle_name, args.pack)
+
+    # If there is only one shard and its name is exactly bundle_name, great.
+    # If multiple shards exist, names will be bundle_name_1 .. _N (first one may be just base if only one shard)
+    # For many shards, with requests + PyNaCl installed, seal and PUT them over
+    # keep-alive API sessions instead of spawning gh for each one.
+    client = None
+    if len(shards) >= REST_MIN_SHARDS and not (args.dry_run or args.use_gh_cli):
+        client = make_rest_client(args.repo)
+
+    def run(shard):
+        return set_secret(args.repo, shard[0], shard[1], dry_run=args.dry_run, client=client)
+
+    if args.dry_run:
+        # Dry runs only print (from set_secret), so keep them sequential and in order
+        results = list(map(run, shards))
+    else:
+        # Each set is an independent HTTPS round-trip, so set the shards concurrently;
+        # map() keeps results in shard order for the summary below.
+        with ThreadPoolExecutor(max_workers=min(8, len(shards))) as ex:
+            results = list(ex.map(run, shards))
 
     total = 0
-    for name, payload in shards:
-        # If there is only one shard and its name is exactly bundle_name, great.
-        # If multiple shards exist, names will be bundle_name_1 .. _N (first one may be just base if only one shard)
-        ok = set_secret(args.repo, name, payload, dry_run=args.dry_run)
+    for (name, payload), ok in zip(shards, results):
         if ok:
             print(f"Set combined secret: {name} (regions: {len(json.loads(payload))})")
             total += 1
@@ -163,7 +301,7 @@ def main():
         # Write a manifest so workflows can discover shards at runtime.
         ok = set_secret(args.repo, f"{args.bundle_name}_MANIFEST",
                         json.dumps(manifest, separators=(',', ':'), ensure_ascii=False),
-                        dry_run=args.dry_run)
+                        dry_run=args.dry_run, client=client)
         if ok:
             print(f"Set manifest: {args.bundle_name}_MANIFEST -> {manifest['shards']}")
 
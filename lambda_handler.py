@@ -10,9 +10,13 @@ Optional CloudFlare Turnstile support for bot protection.
 """
 
 import os
+import json
+import time
 import uuid
 import traceback
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from azure.core.exceptions import ResourceNotFoundError
 from acido.azure_utils.VaultManager import VaultManager
 from acido.utils.lambda_utils import (
     parse_lambda_event,
@@ -24,6 +28,55 @@ from acido.utils.lambda_utils import (
 from acido.utils.crypto_utils import encrypt_secret, decrypt_secret, is_encrypted
 from acido.utils.turnstile_utils import validate_turnstile
 
+try:  # optional: faster encoding of per-request response bodies
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# System-level encryption key, resolved once per container (environment is fixed for its lifetime)
+_SECRET_KEY = os.environ.get('SECRET_KEY')
+
+# Turnstile validation can be switched off (TURNSTILE_ENABLED=0) for dev/stage and tests.
+# Only an explicit "0" disables it; any other value fails closed and keeps bot protection on.
+_TURNSTILE_ENABLED = os.environ.get("TURNSTILE_ENABLED", "1").strip() != "0"
+
+# Request fields read from the parsed event, extracted once per invocation
+_EVENT_KEYS = ("action", "secret", "password", "expires_at", "uuid", "turnstile_token")
+
+# Encryption metadata values grouped by how they are handled
+_ENC_SECRET_KEY_LAYER = frozenset({"secret_key_encrypted", "secret_key_password_encrypted"})
+_ENC_PASSWORD_REQUIRED = frozenset({"encrypted", "secret_key_password_encrypted"})
+_ENC_NO_PASSWORD = frozenset({"plaintext", "secret_key_encrypted"})
+
+# Shared pool for issuing independent Key Vault round-trips concurrently.
+# Module-level so warm invocations reuse the same worker threads.
+_VAULT_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Latest accepted expires_at: 9999-12-31T23:59:59Z, the end of datetime's range
+_MAX_EXPIRES_AT = 253402300799
+
+# Version marker of the packed {uuid} value written by _pack_secret
+_PACKED_FORMAT_VERSION = 1
+
+# Write new secrets in the packed single-value format (PACKED_SECRET_FORMAT=1). Reads always
+# understand both layouts, but handlers predating the packed format return the raw JSON as the
+# secret, so keep this off until rolling back past this version is ruled out.
+_PACKED_SECRET_FORMAT = os.environ.get("PACKED_SECRET_FORMAT") == "1"
+
+# Name suffixes of the sidecar secrets used by the legacy (pre-packed) layout
+_METADATA_SUFFIX = "-metadata"
+_EXPIRES_SUFFIX = "-expires"
+
+# Per-container cache of legacy secret metadata: {uuid: (cached_at, encryption_type, expires_at_str)}.
+# Secrets stored in the legacy layout keep their metadata in separate -metadata and
+# -expires secrets. It never changes after creation, so this only saves Key Vault reads on
+# repeat check/retrieve calls (e.g. check followed by retrieve, or wrong-password retries).
+# The secret itself is always re-read from Key Vault.
+_METADATA_CACHE = {}
+_METADATA_CACHE_TTL = 300
+_METADATA_CACHE_MAX = 1024
+
 
 def _encrypt_with_secret_key(data: str) -> str:
     """
@@ -36,10 +89,9 @@ def _encrypt_with_secret_key(data: str) -> str:
     Returns:
         Encrypted data as string
     """
-    secret_key = os.environ.get('SECRET_KEY')
-    if not secret_key:
+    if not _SECRET_KEY:
         raise ValueError('SECRET_KEY environment variable not set')
-    return encrypt_secret(data, secret_key)
+    return encrypt_secret(data, _SECRET_KEY)
 
 
 def _decrypt_with_secret_key(data: str) -> str:
@@ -53,10 +105,9 @@ def _decrypt_with_secret_key(data: str) -> str:
     Returns:
         Decrypted data as string
     """
-    secret_key = os.environ.get('SECRET_KEY')
-    if not secret_key:
+    if not _SECRET_KEY:
         raise ValueError('SECRET_KEY environment variable not set')
-    return decrypt_secret(data, secret_key)
+    return decrypt_secret(data, _SECRET_KEY)
 
 
 # CORS headers - origin is configurable via CORS_ORIGIN environment variable
@@ -68,7 +119,62 @@ CORS_HEADERS = {
 }
 
 
-def _get_version():
+def _build_json_response(status_code, body):
+    """
+    Build the same response as build_response(status_code, body, CORS_HEADERS),
+    encoding the body with orjson when it is installed.
+    
+    Args:
+        status_code: HTTP status code
+        body: Response body dict
+        
+    Returns:
+        dict: Lambda response object with statusCode, body, and headers
+    """
+    if orjson is not None:
+        encoded = orjson.dumps(body).decode('utf-8')
+    else:
+        encoded = json.dumps(body)
+    return {'statusCode': status_code, 'body': encoded, 'headers': CORS_HEADERS}
+
+
+def _create_vault_manager_on_import():
+    """
+    Build the VaultManager during the Lambda init phase if INSTANTIATE_VAULT_ON_IMPORT=1.
+    
+    Credential bootstrap then runs on the boosted init-phase CPU instead of the first
+    request. Failures are swallowed so a bad configuration doesn't break the container
+    at import; the request path will construct (and report errors for) its own instance.
+    
+    Returns:
+        VaultManager instance or None
+    """
+    if os.environ.get("INSTANTIATE_VAULT_ON_IMPORT") != "1":
+        return None
+    try:
+        return VaultManager()
+    except Exception:
+        return None
+
+
+_VAULT_MANAGER = _create_vault_manager_on_import()
+
+
+@lru_cache(maxsize=1)
+def _get_vault_manager():
+    """
+    Return the container's VaultManager: the import-time instance if one was created,
+    otherwise one built on first use and reused by later warm invocations.
+    
+    Only called after Turnstile validation, so rejected requests never touch Azure.
+    A failed construction isn't cached and is retried on the next request.
+    """
+    if _VAULT_MANAGER is not None:
+        return _VAULT_MANAGER
+    return VaultManager()
+
+
+def _read_version_once():
     """Read version from VERSION file."""
     try:
         version_file = os.path.join(os.path.dirname(__file__), 'VERSION')
@@ -78,57 +184,254 @@ def _get_version():
         return 'unknown'
 
 
-def _delete_secret_and_metadata(vault_manager, secret_uuid):
+# VERSION is part of the immutable image, so read it once during init
+_VERSION = _read_version_once()
+
+
+# Static responses, built once at import and returned as-is on the hot paths.
+# The Lambda runtime only serializes the returned dict, so sharing them is safe.
+_CORS_PREFLIGHT_RESPONSE = build_response(200, {"message": "CORS preflight OK"}, CORS_HEADERS)
+_HEALTH_RESPONSE = build_response(200, {
+    'status': 'healthy',
+    'message': 'Lambda function is running',
+    'version': _VERSION
+}, CORS_HEADERS)
+_MISSING_BODY_RESPONSE = build_error_response(
+    'Missing event body. Expected fields: action, secret (for create), uuid (for retrieve/check)',
+    headers=CORS_HEADERS
+)
+_INVALID_ACTION_RESPONSE = build_error_response(
+    'Invalid or missing action. Must be "create", "retrieve", "check", or "healthcheck"',
+    headers=CORS_HEADERS
+)
+_MISSING_TURNSTILE_RESPONSE = build_error_response(
+    'Missing required field: turnstile_token (bot protection enabled)',
+    headers=CORS_HEADERS
+)
+_INVALID_TURNSTILE_RESPONSE = build_response(403, {'error': 'Invalid or expired Turnstile token'}, CORS_HEADERS)
+_MISSING_SECRET_RESPONSE = build_error_response('Missing required field: secret', headers=CORS_HEADERS)
+_MISSING_UUID_RESPONSE = build_error_response('Missing required field: uuid', headers=CORS_HEADERS)
+_SECRET_NOT_FOUND_RESPONSE = build_response(404, {'error': 'Secret not found or already accessed'}, CORS_HEADERS)
+_PASSWORD_REQUIRED_RESPONSE = build_response(400, {'error': 'Password required for encrypted secret'}, CORS_HEADERS)
+
+
+def _delete_secret_and_metadata(vault_manager, secret_uuid, has_sidecars=True):
     """
     Delete a secret and all its associated metadata.
     
     Args:
         vault_manager: VaultManager instance
         secret_uuid: UUID of the secret to delete
+        has_sidecars: Whether the secret uses the legacy -metadata/-expires secrets
+    """
+    _METADATA_CACHE.pop(secret_uuid, None)
+    
+    # Packed secrets carry their metadata in the value itself
+    if not has_sidecars:
+        vault_manager.delete_secret(secret_uuid)
+        return
+    
+    # Issue the three deletes concurrently; each is a separate Key Vault round-trip
+    secret_delete = _VAULT_POOL.submit(vault_manager.delete_secret, secret_uuid)
+    metadata_deletes = [
+        _VAULT_POOL.submit(vault_manager.delete_secret, secret_uuid + _METADATA_SUFFIX),
+        _VAULT_POOL.submit(vault_manager.delete_secret, secret_uuid + _EXPIRES_SUFFIX),
+    ]
+    
+    # Metadata may not exist - ignore failures deleting it
+    for future in metadata_deletes:
+        try:
+            future.result()
+        except Exception:
+            pass
+    
+    secret_delete.result()
+
+
+def _get_secret_or_none(vault_manager, secret_name):
     """
-    vault_manager.delete_secret(secret_uuid)
+    Get a secret value, returning None if it doesn't exist.
     
-    # Delete metadata if it exists
+    Other read errors (throttling, 5xx) propagate so that a transient failure is
+    never mistaken for an absent sidecar and cached as such.
+    
+    Args:
+        vault_manager: VaultManager instance
+        secret_name: Name of the secret to read
+        
+    Returns:
+        Secret value or None
+    """
     try:
-        vault_manager.delete_secret(f"{secret_uuid}-metadata")
-    except Exception:
-        pass
+        return vault_manager.get_secret(secret_name)
+    except ResourceNotFoundError:
+        return None
+
+
+def _cache_metadata(secret_uuid, encryption_type, expires_at_str):
+    """
+    Remember a secret's metadata in the per-container cache.
     
-    # Delete expiration metadata if it exists
+    Args:
+        secret_uuid: UUID of the secret
+        encryption_type: Encryption metadata value (None if absent)
+        expires_at_str: Expiration metadata value (None if absent)
+    """
+    if len(_METADATA_CACHE) >= _METADATA_CACHE_MAX:
+        _METADATA_CACHE.clear()
+    _METADATA_CACHE[secret_uuid] = (time.monotonic(), encryption_type, expires_at_str)
+
+
+def _get_cached_metadata(secret_uuid):
+    """
+    Look up a secret's metadata in the per-container cache.
+    
+    Args:
+        secret_uuid: UUID of the secret
+        
+    Returns:
+        tuple: (encryption_type, expires_at_str), or None if not cached or stale
+    """
+    entry = _METADATA_CACHE.get(secret_uuid)
+    if entry is None:
+        return None
+    cached_at, encryption_type, expires_at_str = entry
+    if time.monotonic() - cached_at > _METADATA_CACHE_TTL:
+        del _METADATA_CACHE[secret_uuid]
+        return None
+    return encryption_type, expires_at_str
+
+
+def _pack_secret(secret_value, encryption_type, expiration_unix):
+    """
+    Serialize a secret and its metadata into the single value stored under {uuid}.
+    
+    Args:
+        secret_value: Encrypted secret value
+        encryption_type: Type of encryption applied
+        expiration_unix: Optional expiration timestamp
+        
+    Returns:
+        JSON string
+    """
+    return json.dumps({
+        'v': _PACKED_FORMAT_VERSION,
+        'ct': secret_value,
+        'enc': encryption_type,
+        'exp': expiration_unix
+    }, separators=(',', ':'))
+
+
+def _unpack_secret(stored_value):
+    """
+    Parse a value written by _pack_secret.
+    
+    Args:
+        stored_value: Raw value of the {uuid} secret
+        
+    Returns:
+        tuple: (secret_value, encryption_type, expires_at_str), or None for legacy values
+    """
+    # Legacy values are base64 ciphertext (or plaintext); only packed values are JSON objects
+    if not stored_value or not stored_value.startswith('{'):
+        return None
     try:
-        vault_manager.delete_secret(f"{secret_uuid}-expires")
-    except Exception:
-        pass
+        data = json.loads(stored_value)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get('v') != _PACKED_FORMAT_VERSION:
+        return None
+    
+    expires_at = data.get('exp')
+    return data.get('ct'), data.get('enc'), str(expires_at) if expires_at is not None else None
 
 
-def _check_expiration(vault_manager, secret_uuid):
+def _fetch_secret_bundle(vault_manager, secret_uuid):
+    """
+    Fetch a secret with its encryption metadata and expiration.
+    
+    Packed secrets need a single Key Vault read. Legacy secrets additionally read their
+    -metadata and -expires secrets, or take them from the per-container cache. Unless
+    PACKED_SECRET_FORMAT is on, new secrets use the legacy layout, so on a cache miss the
+    sidecar reads are started concurrently with the value read (and discarded if the value
+    turns out to be packed) to keep the lookup to a single round-trip.
+    
+    Args:
+        vault_manager: VaultManager instance
+        secret_uuid: UUID of the secret
+        
+    Returns:
+        tuple: (secret_value, encryption_type, expires_at_str, has_sidecars) -
+        secret_value is None if the secret doesn't exist, metadata values are None if absent
+    """
+    cached = _get_cached_metadata(secret_uuid)
+    sidecars = None
+    if cached is None and not _PACKED_SECRET_FORMAT:
+        sidecars = _submit_sidecar_reads(vault_manager, secret_uuid)
+    
+    try:
+        stored_value = vault_manager.get_secret(secret_uuid)
+    except ResourceNotFoundError:
+        return None, None, None, False
+    
+    unpacked = _unpack_secret(stored_value)
+    if unpacked is not None:
+        return unpacked + (False,)
+    
+    if cached is None:
+        if sidecars is None:
+            sidecars = _submit_sidecar_reads(vault_manager, secret_uuid)
+        # result() re-raises read errors, so only confirmed values (or absences) are cached
+        cached = tuple(future.result() for future in sidecars)
+        _cache_metadata(secret_uuid, *cached)
+    
+    return (stored_value,) + cached + (True,)
+
+
+def _submit_sidecar_reads(vault_manager, secret_uuid):
+    """
+    Start reading a legacy secret's -metadata and -expires secrets on the shared pool.
+    
+    Args:
+        vault_manager: VaultManager instance
+        secret_uuid: UUID of the secret
+        
+    Returns:
+        tuple: (metadata_future, expires_future)
+    """
+    return (
+        _VAULT_POOL.submit(_get_secret_or_none, vault_manager, secret_uuid + _METADATA_SUFFIX),
+        _VAULT_POOL.submit(_get_secret_or_none, vault_manager, secret_uuid + _EXPIRES_SUFFIX),
+    )
+
+
+def _check_expiration(vault_manager, secret_uuid, expires_at_str, has_sidecars):
     """
     Check if a secret has expired. Returns None if not expired or doesn't have expiration.
     
     Args:
         vault_manager: VaultManager instance
         secret_uuid: UUID of the secret to check
+        expires_at_str: Pre-fetched expiration metadata value (None if absent)
+        has_sidecars: Whether the secret uses the legacy -metadata/-expires secrets
         
     Returns:
         dict with error response if expired, None otherwise
     """
-    expires_key = f"{secret_uuid}-expires"
-    try:
-        expires_at_str = vault_manager.get_secret(expires_key)
-        expires_at_unix = int(expires_at_str)
-        expires_at = datetime.fromtimestamp(expires_at_unix, tz=timezone.utc)
-        now = datetime.now(timezone.utc)
-        
-        if now >= expires_at:
-            # Secret has expired - delete it and all metadata
-            _delete_secret_and_metadata(vault_manager, secret_uuid)
-            return build_response(410, {
-                'error': 'Secret has expired and has been deleted',
-                'expired_at': expires_at_unix
-            }, CORS_HEADERS)
-    except Exception:
-        # No expiration metadata means secret doesn't expire
-        pass
+    expires_at_unix = _get_expiration_info(expires_at_str)
+    
+    # No expiration metadata means secret doesn't expire
+    if expires_at_unix is None:
+        return None
+    
+    # Both sides are UNIX seconds - compare directly without building datetimes
+    if time.time() >= expires_at_unix:
+        # Secret has expired - delete it and all metadata
+        _delete_secret_and_metadata(vault_manager, secret_uuid, has_sidecars)
+        return build_response(410, {
+            'error': 'Secret has expired and has been deleted',
+            'expired_at': expires_at_unix
+        }, CORS_HEADERS)
     
     return None
 
@@ -146,20 +449,32 @@ def _validate_expiration_time(expires_at):
     if not expires_at:
         return None, None
     
+    # Reject non-numeric strings up front rather than through int()'s exception path
+    if isinstance(expires_at, str) and not expires_at.strip().isdecimal():
+        return None, build_error_response(
+            f'Invalid expires_at format. Expected UNIX timestamp (integer): {expires_at!r}',
+            headers=CORS_HEADERS
+        )
+    
     try:
         expiration_unix = int(expires_at)
-        expiration_datetime = datetime.fromtimestamp(expiration_unix, tz=timezone.utc)
+        
+        # Keep timestamps within what datetime can represent for clients
+        if expiration_unix > _MAX_EXPIRES_AT:
+            return None, build_error_response(
+                f'expires_at must not be later than {_MAX_EXPIRES_AT} (9999-12-31T23:59:59Z)',
+                headers=CORS_HEADERS
+            )
         
         # Ensure the expiration is in the future
-        now = datetime.now(timezone.utc)
-        if expiration_datetime <= now:
+        if expiration_unix <= int(time.time()):
             return None, build_error_response(
                 'expires_at must be in the future',
                 headers=CORS_HEADERS
             )
         
         return expiration_unix, None
-    except (ValueError, TypeError, OSError) as e:
+    except (ValueError, TypeError, OverflowError) as e:
         return None, build_error_response(
             f'Invalid expires_at format. Expected UNIX timestamp (integer): {str(e)}',
             headers=CORS_HEADERS
@@ -168,11 +483,7 @@ def _validate_expiration_time(expires_at):
 
 def _handle_healthcheck():
     """Handle healthcheck action."""
-    return build_response(200, {
-        'status': 'healthy',
-        'message': 'Lambda function is running',
-        'version': _get_version()
-    }, CORS_HEADERS)
+    return _HEALTH_RESPONSE
 
 
 def _encrypt_secret_layers(secret_value, password):
@@ -211,7 +522,8 @@ def _encrypt_secret_layers(secret_value, password):
 
 def _store_secret_with_metadata(vault_manager, secret_uuid, secret_value, encryption_type, expiration_unix):
     """
-    Store secret and its metadata in vault.
+    Store secret and its metadata in vault, as a single packed value when
+    PACKED_SECRET_FORMAT=1 and otherwise in the legacy -metadata/-expires layout.
     
     Args:
         vault_manager: VaultManager instance
@@ -220,21 +532,31 @@ def _store_secret_with_metadata(vault_manager, secret_uuid, secret_value, encryp
         encryption_type: Type of encryption applied
         expiration_unix: Optional expiration timestamp
     """
-    vault_manager.set_secret(secret_uuid, secret_value)
-    vault_manager.set_secret(f"{secret_uuid}-metadata", encryption_type)
+    if _PACKED_SECRET_FORMAT:
+        vault_manager.set_secret(secret_uuid, _pack_secret(secret_value, encryption_type, expiration_unix))
+        return
+    
+    # Issue the writes concurrently; each is a separate Key Vault round-trip
+    futures = [
+        _VAULT_POOL.submit(vault_manager.set_secret, secret_uuid, secret_value),
+        _VAULT_POOL.submit(vault_manager.set_secret, secret_uuid + _METADATA_SUFFIX, encryption_type),
+    ]
     
     if expiration_unix:
-        vault_manager.set_secret(f"{secret_uuid}-expires", str(expiration_unix))
+        futures.append(_VAULT_POOL.submit(vault_manager.set_secret, secret_uuid + _EXPIRES_SUFFIX, str(expiration_unix)))
+    
+    # Wait for every write before surfacing the first failure
+    wait(futures)
+    for future in futures:
+        future.result()
+    
+    _cache_metadata(secret_uuid, encryption_type, str(expiration_unix) if expiration_unix else None)
 
 
-def _handle_create_secret(event, vault_manager):
+def _handle_create_secret(secret_value, password, expires_at, vault_manager):
     """Handle secret creation action."""
-    secret_value = event.get('secret')
-    password = event.get('password')
-    expires_at = event.get('expires_at')
-    
     if not secret_value:
-        return build_error_response('Missing required field: secret', headers=CORS_HEADERS)
+        return _MISSING_SECRET_RESPONSE
     
     # Validate expiration time
     expiration_unix, error = _validate_expiration_time(expires_at)
@@ -260,24 +582,7 @@ def _handle_create_secret(event, vault_manager):
     if expiration_unix:
         response_data['expires_at'] = expiration_unix
     
-    return build_response(201, response_data, CORS_HEADERS)
-
-
-def _get_encryption_metadata(vault_manager, secret_uuid):
-    """
-    Get encryption metadata for a secret.
-    
-    Args:
-        vault_manager: VaultManager instance
-        secret_uuid: UUID of the secret
-        
-    Returns:
-        Encryption type string or None
-    """
-    try:
-        return vault_manager.get_secret(f"{secret_uuid}-metadata")
-    except Exception:
-        return None
+    return _build_json_response(201, response_data)
 
 
 def _decrypt_secret_layers(secret_value, encryption_type, password):
@@ -293,7 +598,7 @@ def _decrypt_secret_layers(secret_value, encryption_type, password):
         tuple: (decrypted_value, error_response)
     """
     # New encryption scheme with SECRET_KEY
-    if encryption_type in ["secret_key_encrypted", "secret_key_password_encrypted"]:
+    if encryption_type in _ENC_SECRET_KEY_LAYER:
         try:
             secret_value = _decrypt_with_secret_key(secret_value)
         except Exception as e:
@@ -302,7 +607,7 @@ def _decrypt_secret_layers(secret_value, encryption_type, password):
         # Decrypt with user password if needed
         if encryption_type == "secret_key_password_encrypted":
             if not password:
-                return None, build_response(400, {'error': 'Password required for encrypted secret'}, CORS_HEADERS)
+                return None, _PASSWORD_REQUIRED_RESPONSE
             try:
                 secret_value = decrypt_secret(secret_value, password)
             except ValueError as e:
@@ -311,7 +616,7 @@ def _decrypt_secret_layers(secret_value, encryption_type, password):
     # Legacy encryption scheme
     elif encryption_type == "encrypted":
         if not password:
-            return None, build_response(400, {'error': 'Password required for encrypted secret'}, CORS_HEADERS)
+            return None, _PASSWORD_REQUIRED_RESPONSE
         try:
             secret_value = decrypt_secret(secret_value, password)
         except ValueError as e:
@@ -324,7 +629,7 @@ def _decrypt_secret_layers(secret_value, encryption_type, password):
     else:
         if is_encrypted(secret_value):
             if not password:
-                return None, build_response(400, {'error': 'Password required for encrypted secret'}, CORS_HEADERS)
+                return None, _PASSWORD_REQUIRED_RESPONSE
             try:
                 secret_value = decrypt_secret(secret_value, password)
             except ValueError as e:
@@ -333,104 +638,89 @@ def _decrypt_secret_layers(secret_value, encryption_type, password):
     return secret_value, None
 
 
-def _handle_retrieve_secret(event, vault_manager):
+def _handle_retrieve_secret(secret_uuid, password, vault_manager):
     """Handle secret retrieval and deletion action."""
-    secret_uuid = event.get('uuid')
-    password = event.get('password')
-    
     if not secret_uuid:
-        return build_error_response('Missing required field: uuid', headers=CORS_HEADERS)
+        return _MISSING_UUID_RESPONSE
     
-    # Check if secret exists
-    if not vault_manager.secret_exists(secret_uuid):
-        return build_response(404, {'error': 'Secret not found or already accessed'}, CORS_HEADERS)
+    # Fetch secret and metadata
+    secret_value, encryption_type, expires_at_str, has_sidecars = _fetch_secret_bundle(vault_manager, secret_uuid)
+    if secret_value is None:
+        return _SECRET_NOT_FOUND_RESPONSE
     
     # Check expiration
-    expiration_error = _check_expiration(vault_manager, secret_uuid)
+    expiration_error = _check_expiration(vault_manager, secret_uuid, expires_at_str, has_sidecars)
     if expiration_error:
         return expiration_error
     
-    # Get encryption metadata and secret value
-    encryption_type = _get_encryption_metadata(vault_manager, secret_uuid)
-    secret_value = vault_manager.get_secret(secret_uuid)
-    
     # Decrypt secret
     decrypted_value, error = _decrypt_secret_layers(secret_value, encryption_type, password)
     if error:
         return error
     
     # Delete secret and all metadata (one-time access)
-    _delete_secret_and_metadata(vault_manager, secret_uuid)
+    _delete_secret_and_metadata(vault_manager, secret_uuid, has_sidecars)
     
-    return build_response(200, {
+    return _build_json_response(200, {
         'secret': decrypted_value,
         'message': 'Secret retrieved and deleted successfully'
-    }, CORS_HEADERS)
+    })
 
 
-def _get_expiration_info(vault_manager, secret_uuid):
+def _get_expiration_info(expires_at_str):
     """
     Get expiration information for a secret.
     
     Args:
-        vault_manager: VaultManager instance
-        secret_uuid: UUID of the secret
+        expires_at_str: Pre-fetched expiration metadata value (None if absent)
         
     Returns:
         UNIX timestamp or None
     """
-    try:
-        expires_at_str = vault_manager.get_secret(f"{secret_uuid}-expires")
-        return int(expires_at_str)
-    except Exception:
+    # Stored values are always str(int); check the format instead of catching int() errors
+    if not expires_at_str or not expires_at_str.isdecimal():
         return None
+    return int(expires_at_str)
 
 
-def _check_password_requirement(vault_manager, secret_uuid):
+def _check_password_requirement(secret_value, metadata_value):
     """
     Check if secret requires a password for decryption.
     
     Args:
-        vault_manager: VaultManager instance
-        secret_uuid: UUID of the secret
+        secret_value: Pre-fetched stored secret value
+        metadata_value: Pre-fetched encryption metadata (None if absent)
         
     Returns:
         bool: True if password is required
     """
-    metadata_value = _get_encryption_metadata(vault_manager, secret_uuid)
-    
-    if metadata_value in ["encrypted", "secret_key_password_encrypted"]:
+    if metadata_value in _ENC_PASSWORD_REQUIRED:
         return True
-    elif metadata_value in ["plaintext", "secret_key_encrypted"]:
+    elif metadata_value in _ENC_NO_PASSWORD:
         return False
     
     # Fallback to heuristic for backward compatibility
-    try:
-        secret_value = vault_manager.get_secret(secret_uuid)
-        return is_encrypted(secret_value)
-    except Exception:
-        return False
+    return is_encrypted(secret_value)
 
 
-def _handle_check_secret(event, vault_manager):
+def _handle_check_secret(secret_uuid, vault_manager):
     """Handle checking if a secret is encrypted without retrieving it."""
-    secret_uuid = event.get('uuid')
-    
     if not secret_uuid:
-        return build_error_response('Missing required field: uuid', headers=CORS_HEADERS)
+        return _MISSING_UUID_RESPONSE
     
-    # Check if secret exists
-    if not vault_manager.secret_exists(secret_uuid):
-        return build_response(404, {'error': 'Secret not found or already accessed'}, CORS_HEADERS)
+    # Fetch secret and metadata
+    secret_value, encryption_type, expires_at_str, has_sidecars = _fetch_secret_bundle(vault_manager, secret_uuid)
+    if secret_value is None:
+        return _SECRET_NOT_FOUND_RESPONSE
     
     # Check expiration
-    expiration_error = _check_expiration(vault_manager, secret_uuid)
+    expiration_error = _check_expiration(vault_manager, secret_uuid, expires_at_str, has_sidecars)
     if expiration_error:
         return expiration_error
     
     # Get password requirement and expiration info
-    requires_password = _check_password_requirement(vault_manager, secret_uuid)
-    expires_at_unix = _get_expiration_info(vault_manager, secret_uuid)
+    requires_password = _check_password_requirement(secret_value, encryption_type)
+    expires_at_unix = _get_expiration_info(expires_at_str)
     
     # Build response
     response_data = {
@@ -440,7 +730,7 @@ def _handle_check_secret(event, vault_manager):
     if expires_at_unix:
         response_data['expires_at'] = expires_at_unix
     
-    return build_response(200, response_data, CORS_HEADERS)
+    return _build_json_response(200, response_data)
 
 
 def _validate_action(action):
@@ -454,37 +744,32 @@ def _validate_action(action):
         Error response or None if valid
     """
     if not action or action not in ['create', 'retrieve', 'check']:
-        return build_error_response(
-            'Invalid or missing action. Must be "create", "retrieve", "check", or "healthcheck"',
-            headers=CORS_HEADERS
-        )
+        return _INVALID_ACTION_RESPONSE
     return None
 
 
-def _validate_turnstile(event, original_event, context):
+def _validate_turnstile(turnstile_token, original_event, context):
     """
     Validate CloudFlare Turnstile token.
     
     Args:
-        event: Parsed event
+        turnstile_token: Turnstile token from the parsed event
         original_event: Original event
         context: Lambda context
         
     Returns:
         Error response or None if valid
     """
-    turnstile_token = event.get('turnstile_token')
+    if not _TURNSTILE_ENABLED:
+        return None
     
     if not turnstile_token:
-        return build_error_response(
-            'Missing required field: turnstile_token (bot protection enabled)',
-            headers=CORS_HEADERS
-        )
+        return _MISSING_TURNSTILE_RESPONSE
     
     remoteip = extract_remote_ip(original_event, context)
     
     if not validate_turnstile(turnstile_token, remoteip):
-        return build_response(403, {'error': 'Invalid or expired Turnstile token'}, CORS_HEADERS)
+        return _INVALID_TURNSTILE_RESPONSE
     
     return None
 
@@ -543,6 +828,9 @@ def lambda_handler(event, context):
     
     Environment variables optional:
     - CORS_ORIGIN: CORS origin URL (default: https://secrets.merabytes.com)
+    - TURNSTILE_ENABLED: Set to "0" to skip Turnstile validation in dev/stage; any other value keeps it on
+    - INSTANTIATE_VAULT_ON_IMPORT: Set to "1" to create the VaultManager at import time (default: off)
+    - PACKED_SECRET_FORMAT: Set to "1" to store new secrets as a single packed value (default: off)
     
     Multi-layer encryption:
     - All secrets are encrypted with SECRET_KEY (system-level encryption, always applied)
@@ -569,16 +857,15 @@ def lambda_handler(event, context):
     
     # Handle OPTIONS preflight
     if extract_http_method(original_event) == "OPTIONS":
-        return build_response(200, {"message": "CORS preflight OK"}, CORS_HEADERS)
+        return _CORS_PREFLIGHT_RESPONSE
     
     # Validate event body
     if not event:
-        return build_error_response(
-            'Missing event body. Expected fields: action, secret (for create), uuid (for retrieve/check)',
-            headers=CORS_HEADERS
-        )
+        return _MISSING_BODY_RESPONSE
     
-    action = event.get('action')
+    action, secret_value, password, expires_at, secret_uuid, turnstile_token = (
+        event.get(key) for key in _EVENT_KEYS
+    )
     
     # Handle healthcheck (no turnstile required)
     if action == 'healthcheck':
@@ -590,19 +877,19 @@ def lambda_handler(event, context):
         return error
     
     # Validate turnstile token
-    error = _validate_turnstile(event, original_event, context)
+    error = _validate_turnstile(turnstile_token, original_event, context)
     if error:
         return error
     
     try:
-        vault_manager = VaultManager()
+        vault_manager = _get_vault_manager()
         
         if action == 'create':
-            return _handle_create_secret(event, vault_manager)
+            return _handle_create_secret(secret_value, password, expires_at, vault_manager)
         elif action == 'retrieve':
-            return _handle_retrieve_secret(event, vault_manager)
+            return _handle_retrieve_secret(secret_uuid, password, vault_manager)
         elif action == 'check':
-            return _handle_check_secret(event, vault_manager)
+            return _handle_check_secret(secret_uuid, vault_manager)
         
     except Exception as e:
         return build_response(500, {
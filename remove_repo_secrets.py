@@ -1,18 +1,41 @@
 #!/usr/bin/env python3
 import argparse
-import re
 import subprocess
 import sys
-from typing import Dict, Tuple, Set, List
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple, Set, List
 from fnmatch import fnmatch
 
-EXPORT_RE = re.compile(r'^\s*export\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)\s*$')
+try:  # optional: remove secrets in-process via the REST API instead of one gh call per secret
+    import requests
+except ImportError:
+    requests = None
 
-def parse_export_line(line: str) -> Tuple[str, str]:
-    m = EXPORT_RE.match(line)
-    if not m:
+GITHUB_API = "https://api.github.com"
+# (connect, read) seconds; requests otherwise waits forever and a stalled call hangs a pool worker
+GITHUB_API_TIMEOUT = (5, 30)
+
+_EXPORT = "export"
+_EXPORT_LEN = len(_EXPORT)
+
+def _split_export(line: str) -> Tuple[str, str]:
+    """
+    Split '  export NAME = raw' into (NAME, raw) with plain string operations.
+    Raises ValueError if the line isn't an export assignment.
+    """
+    line = line.lstrip()
+    if not line.startswith(_EXPORT) or not line[_EXPORT_LEN:_EXPORT_LEN + 1].isspace():
+        raise ValueError("Not an export line")
+    name, sep, raw = line[_EXPORT_LEN:].partition("=")
+    name = name.strip()
+    if not sep or not (name.isascii() and name.isidentifier()):
         raise ValueError("Not an export line")
-    name, raw = m.group(1), m.group(2).strip()
+    return name, raw.strip()
+
+def parse_export_line(line: str) -> Tuple[str, str]:
+    name, raw = _split_export(line)
     if raw == "":
         return name, ""
     if (raw.startswith('"') and raw.endswith('"')) or (raw.startswith("'") and raw.endswith("'")):
@@ -44,34 +67,109 @@ def list_existing_secret_names(repo: str) -> Set[str]:
     """
     Uses `gh secret list` and returns a set of existing secret NAMES in the repo.
     """
-    try:
-        proc = subprocess.run(
-            ["gh", "secret", "list", "-R", repo],
-            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-    except subprocess.CalledProcessError as e:
-        sys.exit(f"ERROR listing secrets: {e.stderr.strip() or e.stdout.strip() or e}")
+    # Parse lines as gh writes them rather than buffering the whole listing first.
+    # stderr goes to a temp file: a second pipe read only after stdout's EOF could
+    # fill up and block gh (and so us) forever.
     names = set()
-    for line in proc.stdout.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        # Expected format is a table like: NAME  updated ...
-        # We take the first whitespace-separated token as the name.
-        tok = line.split()[0]
-        # Skip header separators if any
-        if tok.upper() in {"NAME", "SECRET"} or set(tok) == {"-"}:
-            continue
-        names.add(tok)
+    with tempfile.TemporaryFile(mode="w+") as errf:
+        with subprocess.Popen(["gh", "secret", "list", "-R", repo],
+                              stdout=subprocess.PIPE, stderr=errf, text=True, bufsize=1) as proc:
+            for line in proc.stdout:
+                # Expected format is a table like: NAME  updated ...
+                # We take the first whitespace-separated token as the name.
+                parts = line.split(maxsplit=1)
+                if not parts:
+                    continue
+                tok = parts[0]
+                # Skip header separators if any
+                if tok.upper() in {"NAME", "SECRET"} or set(tok) == {"-"}:
+                    continue
+                names.add(tok)
+        if proc.returncode != 0:
+            errf.seek(0)
+            err = errf.read().strip()
+            sys.exit(f"ERROR listing secrets: {err or f'gh exited with status {proc.returncode}'}")
     return names
 
 def should_protect(name: str, protect_patterns: List[str]) -> bool:
     return any(fnmatch(name, pat) for pat in protect_patterns)
 
-def remove_secret(repo: str, name: str, dry_run: bool) -> bool:
+def _github_token() -> str:
+    """Return gh's stored token, so no further gh processes are needed."""
+    proc = subprocess.run(["gh", "auth", "token", "-h", "github.com"],
+                          check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return proc.stdout.strip()
+
+def _github_session(token: str) -> "requests.Session":
+    """Return a keep-alive requests.Session authenticated with token."""
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    })
+    return session
+
+class RestSecretClient:
+    """
+    Removes repository secrets through the GitHub REST API.
+    requests.Session isn't documented as thread-safe, so each pool thread
+    gets its own keep-alive session.
+    """
+
+    def __init__(self, repo: str):
+        self.repo = repo
+        self.token = _github_token()
+        self._local = threading.local()
+        # Probe once so a token without the needed scope, or a HOST/OWNER/REPO that
+        # isn't on api.github.com, falls back to gh instead of failing every DELETE
+        resp = self.session.get(f"{GITHUB_API}/repos/{repo}/actions/secrets", params={"per_page": 1},
+                                timeout=GITHUB_API_TIMEOUT)
+        resp.raise_for_status()
+
+    @property
+    def session(self) -> "requests.Session":
+        """This thread's session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = _github_session(self.token)
+        return session
+
+    def remove_secret(self, name: str) -> "requests.Response":
+        return self.session.delete(f"{GITHUB_API}/repos/{self.repo}/actions/secrets/{name}",
+                                   timeout=GITHUB_API_TIMEOUT)
+
+def make_rest_client(repo: str) -> Optional[RestSecretClient]:
+    """Return a RestSecretClient, or None to fall back to gh (requests missing or setup failed)."""
+    if requests is None:
+        return None
+    try:
+        return RestSecretClient(repo)
+    except subprocess.CalledProcessError as e:
+        sys.stderr.write(f"REST API unavailable ({e.stderr.strip() or e}); falling back to gh secret remove\n")
+    except requests.RequestException as e:
+        sys.stderr.write(f"REST API unavailable ({e}); falling back to gh secret remove\n")
+    return None
+
+def remove_secret(repo: str, name: str, dry_run: bool,
+                  client: Optional[RestSecretClient] = None) -> bool:
     if dry_run:
         print(f"[dry-run] Would remove secret {name} from {repo}")
         return True
+    if client is not None:
+        try:
+            resp = client.remove_secret(name)
+        except requests.RequestException as e:
+            sys.stderr.write(f"Failed to remove {name}: {e}\n")
+            return False
+        if resp.status_code == 404:
+            # Already gone; like gh failures, that's a non-fatal miss.
+            sys.stderr.write(f"Skip {name}: not found\n")
+            return False
+        if not resp.ok:
+            sys.stderr.write(f"Failed to remove {name}: HTTP {resp.status_code} {resp.reason}\n")
+            return False
+        return True
     try:
         subprocess.run(["gh", "secret", "remove", name, "-R", repo],
                        check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
@@ -92,6 +190,11 @@ def main():
                         help="Comma-separated glob patterns to keep (e.g. 'AZURE_REGION_CONFIGS*,FOO_MANIFEST'). "
                              "Default protects combined bundle & shards: 'AZURE_REGION_CONFIGS*'")
     parser.add_argument("--dry-run", action="store_true", help="Print actions without removing secrets")
+    parser.add_argument("--use-gh-cli", action="store_true",
+                        help="Always shell out to 'gh secret remove', even if requests is installed")
+    parser.add_argument("--skip-existence-check", action="store_true",
+                        help="Don't list the repo's secrets first; attempt every removal and report "
+                             "missing ones as skipped")
     args = parser.parse_args()
 
     ensure_gh_logged_in()
@@ -109,8 +212,9 @@ def main():
     # Build protection list
     protect_patterns = [p.strip() for p in args.protect.split(",") if p.strip()]
 
-    # Only try to remove secrets that currently exist
-    existing = list_existing_secret_names(args.repo)
+    # Only try to remove secrets that currently exist. With --skip-existence-check the
+    # listing round-trip is skipped and a missing secret surfaces as a non-fatal remove failure.
+    existing = None if args.skip_existence_check else list_existing_secret_names(args.repo)
 
     to_remove: List[str] = []
     skipped_protected: List[str] = []
@@ -120,24 +224,44 @@ def main():
         if should_protect(n, protect_patterns):
             skipped_protected.append(n)
             continue
-        if n not in existing:
+        if existing is not None and n not in existing:
             skipped_missing.append(n)
             continue
         to_remove.append(n)
 
-    print(f"Found {len(existing)} existing secrets in {args.repo}.")
+    if existing is not None:
+        print(f"Found {len(existing)} existing secrets in {args.repo}.")
     if skipped_protected:
         print(f"Protected (skipped): {len(skipped_protected)}")
     if skipped_missing:
         print(f"Not present (skipped): {len(skipped_missing)}")
 
+    # With requests installed, DELETE over keep-alive sessions instead of spawning gh per secret.
+    client = None
+    if not (args.dry_run or args.use_gh_cli):
+        client = make_rest_client(args.repo)
+
+    def run(name):
+        return remove_secret(args.repo, name, args.dry_run, client=client)
+
+    to_remove = sorted(set(to_remove))
+    if args.dry_run:
+        # Dry runs only print (from remove_secret), so keep them sequential and in order
+        results = list(map(run, to_remove))
+    else:
+        # Each removal is an independent HTTPS round-trip, so run them concurrently;
+        # a small pool keeps clear of GitHub's secondary rate limits, and map()
+        # keeps results in sorted order for the summary below.
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            results = list(ex.map(run, to_remove))
+
     removed = 0
-    for n in sorted(set(to_remove)):
-        if remove_secret(args.repo, n, args.dry_run):
+    for n, success in zip(to_remove, results):
+        if success:
             print(f"Removed: {n}")
             removed += 1
 
-    print(f"\nDone. {removed}/{len(set(to_remove))} secrets {'would be ' if args.dry_run else ''}removed from {args.repo}.")
+    print(f"\nDone. {removed}/{len(to_remove)} secrets {'would be ' if args.dry_run else ''}removed from {args.repo}.")
     if protect_patterns:
         print("Protection patterns:", ", ".join(protect_patterns))
 
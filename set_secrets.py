@@ -1,13 +1,40 @@
 #!/usr/bin/env python3
 import argparse
+import base64
 import os
-import re
 import shlex
 import subprocess
 import sys
-from typing import Dict, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 
-EXPORT_RE = re.compile(r'^\s*export\s+([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)\s*$')
+try:  # optional: set secrets in-process via the REST API instead of one gh call per secret
+    import requests
+    from nacl import encoding, public
+except ImportError:
+    requests = None
+
+GITHUB_API = "https://api.github.com"
+# (connect, read) seconds; requests otherwise waits forever and a stalled call hangs a pool worker
+GITHUB_API_TIMEOUT = (5, 30)
+
+_EXPORT = "export"
+_EXPORT_LEN = len(_EXPORT)
+
+def _split_export(line: str) -> Tuple[str, str]:
+    """
+    Split '  export NAME = raw' into (NAME, raw) with plain string operations.
+    Raises ValueError if the line isn't an export assignment.
+    """
+    line = line.lstrip()
+    if not line.startswith(_EXPORT) or not line[_EXPORT_LEN:_EXPORT_LEN + 1].isspace():
+        raise ValueError("Not an export line")
+    name, sep, raw = line[_EXPORT_LEN:].partition("=")
+    name = name.strip()
+    if not sep or not (name.isascii() and name.isidentifier()):
+        raise ValueError("Not an export line")
+    return name, raw.strip()
 
 def parse_export_line(line: str) -> Tuple[str, str]:
     """
@@ -15,13 +42,9 @@ def parse_export_line(line: str) -> Tuple[str, str]:
     Returns (name, value) with quotes around VALUE removed if present.
     Raises ValueError if the line isn't an export assignment.
     """
-    m = EXPORT_RE.match(line)
-    if not m:
-        raise ValueError("Not an export line")
-    name, raw = m.group(1), m.group(2)
+    name, raw = _split_export(line)
 
     # Handle empty assignment (e.g., NAME= or NAME="")
-    raw = raw.strip()
     if raw == "":
         return name, ""
 
@@ -59,20 +82,90 @@ def ensure_gh_logged_in():
     except (subprocess.CalledProcessError, FileNotFoundError):
         sys.exit("ERROR: GitHub CLI ('gh') not available or not logged in. Run: gh auth login")
 
-def set_secret(repo: str, name: str, value: str, dry_run: bool = False) -> bool:
+def _github_token() -> str:
+    """Return gh's stored token, so no further gh processes are needed."""
+    proc = subprocess.run(["gh", "auth", "token", "-h", "github.com"],
+                          check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return proc.stdout.strip()
+
+def _github_session(token: str) -> "requests.Session":
+    """Return a keep-alive requests.Session authenticated with token."""
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    })
+    return session
+
+class RestSecretClient:
+    """
+    Sets repository secrets through the GitHub REST API.
+    The repo public key is fetched once and reused to seal every value.
+    requests.Session isn't documented as thread-safe, so each pool thread
+    gets its own keep-alive session.
+    """
+
+    def __init__(self, repo: str):
+        self.repo = repo
+        self.token = _github_token()
+        self._local = threading.local()
+        resp = self.session.get(f"{GITHUB_API}/repos/{repo}/actions/secrets/public-key",
+                                timeout=GITHUB_API_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
+        self.key_id = data["key_id"]
+        self.box = public.SealedBox(public.PublicKey(data["key"].encode(), encoding.Base64Encoder))
+
+    @property
+    def session(self) -> "requests.Session":
+        """This thread's session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = _github_session(self.token)
+        return session
+
+    def set_secret(self, name: str, value: str):
+        sealed = base64.b64encode(self.box.encrypt(value.encode("utf-8"))).decode("ascii")
+        resp = self.session.put(f"{GITHUB_API}/repos/{self.repo}/actions/secrets/{name}",
+                                json={"encrypted_value": sealed, "key_id": self.key_id},
+                                timeout=GITHUB_API_TIMEOUT)
+        resp.raise_for_status()
+
+def make_rest_client(repo: str) -> Optional[RestSecretClient]:
+    """Return a RestSecretClient, or None to fall back to gh (deps missing or setup failed)."""
+    if requests is None:
+        return None
+    try:
+        return RestSecretClient(repo)
+    except (subprocess.CalledProcessError, requests.RequestException, KeyError, ValueError) as e:
+        sys.stderr.write(f"REST API unavailable ({e}); falling back to gh secret set\n")
+        return None
+
+def set_secret(repo: str, name: str, value: str, dry_run: bool = False,
+               client: Optional[RestSecretClient] = None) -> bool:
     """
-    Create/update a single repository secret using gh.
+    Create/update a single repository secret, through client if given, else using gh.
     Returns True on success.
     """
     if dry_run:
         print(f"[dry-run] Would set secret {name} in {repo}")
         return True
 
-    # Use -R for repo, -b to pass the value from stdin buffer
+    if client is not None:
+        try:
+            client.set_secret(name, value)
+            return True
+        except requests.RequestException as e:
+            sys.stderr.write(f"Failed to set {name}: {e}\n")
+            return False
+
+    # Use -R for repo; with no -b, gh reads the value from stdin.
     # Note: Avoid passing secret via command args or environment where possible.
     try:
         proc = subprocess.run(
-            ["gh", "secret", "set", name, "-R", repo, "-b", value],
+            ["gh", "secret", "set", name, "-R", repo],
+            input=value,
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -91,6 +184,8 @@ def main():
     parser.add_argument("--repo", default="merabytes/secrets-lambda",
                         help="Target GitHub repo in OWNER/REPO form (default: merabytes/secrets-lambda)")
     parser.add_argument("--dry-run", action="store_true", help="Print actions without creating secrets")
+    parser.add_argument("--use-gh-cli", action="store_true",
+                        help="Always shell out to 'gh secret set', even if requests and PyNaCl are installed")
     args = parser.parse_args()
 
     ensure_gh_logged_in()
@@ -105,9 +200,27 @@ def main():
     if not secrets:
         sys.exit("No valid secrets found to set (all empty/placeholders or no 'export' lines).")
 
+    # With requests + PyNaCl installed, talk to the REST API over keep-alive sessions
+    # instead of spawning gh (which re-fetches the public key) for every secret.
+    client = None
+    if not (args.dry_run or args.use_gh_cli):
+        client = make_rest_client(args.repo)
+
+    def run(item):
+        return set_secret(args.repo, item[0], item[1], dry_run=args.dry_run, client=client)
+
+    if args.dry_run:
+        # Dry runs only print (from set_secret), so keep them sequential and in order
+        results = list(map(run, secrets.items()))
+    else:
+        # Each set is an independent HTTPS round-trip, so run them concurrently;
+        # a small pool keeps clear of GitHub's secondary rate limits, and map()
+        # keeps results in input order for the summary below.
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            results = list(ex.map(run, secrets.items()))
+
     ok = 0
-    for name, value in secrets.items():
-        success = set_secret(args.repo, name, value, dry_run=args.dry_run)
+    for name, success in zip(secrets, results):
         if success:
             print(f"Set secret: {name}")
             ok += 1